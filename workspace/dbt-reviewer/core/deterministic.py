@@ -1,13 +1,22 @@
 """Rule-based dbt SQL checks that require no LLM."""
 
 import re
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Set
 
 from .diff_parser import FileDiff
 
+# Optional acceleration: Hyperscan compiles all rule patterns into one DFA and
+# finds candidate lines in a single scan over the whole diff buffer. The pure
+# `re` path below remains the source of truth and the fallback.
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
 
-@dataclass
+
+@dataclass(slots=True)
 class Finding:
     rule: str
     severity: str       # "error" | "warning" | "info"
@@ -18,32 +27,141 @@ class Finding:
 
 
 # ---------------------------------------------------------------------------
-# Individual check functions
+# Patterns and per-line scanner
 # ---------------------------------------------------------------------------
 
+# Byte tokens every rule requires somewhere in the line; bytes.__contains__ is
+# a memchr-backed scan, far cheaper than a regex dispatch, so lines missing all
+# of them are rejected before the combined pattern runs.
+_STAR_B = b"*"
+_FROM_B = b"from"
+_JOIN_B = b"join"
+
 _JINJA_RE = re.compile(r"\{\{[^}]+\}\}")
-_SELECT_STAR_RE = re.compile(r"\bselect\s+\*", re.IGNORECASE)
-# Match schema.table or db.schema.table *inside* FROM / JOIN clauses
-_FROM_JOIN_SCHEMA_RE = re.compile(
-    r"\b(?:from|join)\s+([a-zA-Z_][a-zA-Z0-9_]*)\.([a-zA-Z_][a-zA-Z0-9_]*)",
-    re.IGNORECASE,
+# All three rules in one alternation so each line is traversed once. The named
+# group that matched tells the scanner which rule fired:
+#   star — SELECT *
+#   s1/s2 — hardcoded schema.table inside FROM / JOIN
+#   bare — dbt-model-looking name (stg_, fct_, dim_, int_, mart_, base_) without ref()
+# The pattern is lowercase-only and compiled with re.ASCII — the scanner runs
+# it against a pre-lowered copy of the line and pulls the original-case text
+# back out via match spans, avoiding per-character case folding in the engine.
+_COMBINED_RE = re.compile(
+    r"(?P<star>\bselect\s+\*)"
+    r"|(?:^|[\s(,])(?:from|join)\s+(?:"
+    r"(?P<s1>[a-z_][a-z0-9_]*)\.(?P<s2>[a-z_][a-z0-9_]*)"
+    r"|(?P<bare>(?:stg|fct|dim|int|mart|base)_[a-z0-9_]+)\b"
+    r")",
+    re.ASCII,
 )
-# Direct dbt-model-looking names (stg_, fct_, dim_, int_, mart_, base_) without ref()
-_DBT_MODEL_BARE_RE = re.compile(
-    r"\b(?:from|join)\s+((?:stg|fct|dim|int|mart|base)_[a-zA-Z0-9_]+)\b",
-    re.IGNORECASE,
+# The bare-model branch alone, for re-checking templated lines against the
+# empty-string Jinja erasure (see _scan_line).
+_BARE_JINJA_RE = re.compile(
+    r"(?:^|[\s(,])(?:from|join)\s+(?P<bare>(?:stg|fct|dim|int|mart|base)_[a-z0-9_]+)\b",
+    re.ASCII,
 )
 
 
-def check_select_star(file_diff: FileDiff) -> List[Finding]:
+# Hyperscan mirrors of the three rule patterns (no capture groups — Hyperscan
+# only reports offsets, so matched lines are re-run through the `re` patterns
+# to extract groups and apply the Jinja/comment guards). The buffer holds the
+# raw lines while the `re` path matches the Jinja-erased form, so any line
+# containing "{{" is kept as a candidate via the fourth pattern — otherwise
+# e.g. "from {{ target.schema }}.accounts" would never reach the scanner.
+_HS_PATTERNS = [
+    rb"\bselect\s+\*",
+    rb"\b(?:from|join)\s+[a-zA-Z_][a-zA-Z0-9_]*\.[a-zA-Z_][a-zA-Z0-9_]*",
+    rb"\b(?:from|join)\s+(?:stg|fct|dim|int|mart|base)_[a-zA-Z0-9_]+\b",
+    rb"\{\{",
+]
+
+
+def _build_hs_db():
+    if hyperscan is None:
+        return None
+    flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST
+    db = hyperscan.Database()
+    try:
+        db.compile(
+            expressions=_HS_PATTERNS,
+            ids=list(range(len(_HS_PATTERNS))),
+            flags=[flags] * len(_HS_PATTERNS),
+        )
+    except hyperscan.error:
+        return None
+    return db
+
+
+_HS_DB = _build_hs_db()
+
+
+def _hs_candidate_lines(lines: List[str]) -> Set[int]:
+    """Scan all added lines as one buffer and return indices of lines that
+    may match at least one rule pattern."""
+    offsets: List[int] = []
+    parts: List[bytes] = []
+    pos = 0
+    for line in lines:
+        encoded = line.encode("utf-8", "replace")
+        offsets.append(pos)
+        parts.append(encoded)
+        pos += len(encoded) + 1  # account for the "\n" separator
+    buf = b"\n".join(parts)
+
+    candidates: Set[int] = set()
+
+    def on_match(pattern_id: int, start: int, end: int, flags: int, context=None):
+        candidates.add(bisect_right(offsets, start) - 1)
+
+    _HS_DB.scan(buf, match_event_handler=on_match)
+    return candidates
+
+
+@dataclass(slots=True)
+class _LineCtx:
+    """Derived forms of one added line, computed once and shared by all rules."""
+    line: str
+    stripped: str
+    lower_bytes: bytes
+    jinja_stripped: str
+
+
+def _make_line_ctx(line: str, stripped: str, lower_bytes: bytes) -> _LineCtx:
+    return _LineCtx(
+        line=line,
+        stripped=stripped,
+        lower_bytes=lower_bytes,
+        # Erase Jinja expressions so ref()/source() calls are invisible to the
+        # regex; the memchr-backed "{{" test skips the sub for plain SQL lines.
+        jinja_stripped=_JINJA_RE.sub("__JINJA__", line) if "{{" in line else line,
+    )
+
+
+def _scan_line(file_diff: FileDiff, ctx: _LineCtx, line_number: int) -> List[Finding]:
+    """Run all rule checks against a single added line."""
     findings: List[Finding] = []
-    seen: set[str] = set()
-    for idx, line in enumerate(file_diff.added_lines):
-        stripped = line.strip()
-        if stripped in seen:
-            continue
-        if _SELECT_STAR_RE.search(stripped):
-            seen.add(stripped)
+
+    stripped = ctx.stripped
+    clean = ctx.jinja_stripped
+    is_comment = stripped.startswith("--")
+    has_ref = "ref(" in ctx.line
+    star_reported = False
+    schema_reported = False
+    reported_bare: Set[str] = set()
+
+    # Match against the lowered copy; for ASCII text the spans index into
+    # `clean` identically, so reported identifiers keep their original case.
+    # str.lower() can change the length for some non-ASCII characters (e.g.
+    # U+0130 "İ" lowers to two code points), which would desync the spans —
+    # slice the lowered text instead in that rare case.
+    lowered = clean.lower()
+    if len(lowered) != len(clean):
+        clean = lowered
+    for match in _COMBINED_RE.finditer(lowered):
+        if match.lastgroup == "star":
+            if star_reported:
+                continue
+            star_reported = True
             findings.append(
                 Finding(
                     rule="SELECT_STAR",
@@ -51,28 +169,14 @@ def check_select_star(file_diff: FileDiff) -> List[Finding]:
                     file=file_diff.filename,
                     message="SELECT * detected — enumerate columns explicitly to avoid schema drift",
                     line=stripped,
-                    line_number=file_diff.added_line_numbers[idx],
+                    line_number=line_number,
                 )
             )
-    return findings
-
-
-def check_hardcoded_schema(file_diff: FileDiff) -> List[Finding]:
-    """Flag schema.table references inside FROM / JOIN that are not wrapped in Jinja."""
-    findings: List[Finding] = []
-    seen: set[str] = set()
-    for idx, line in enumerate(file_diff.added_lines):
-        stripped = line.strip()
-        if stripped in seen:
-            continue
-        if stripped.startswith("--"):
-            continue
-        # Erase Jinja expressions so ref()/source() calls are invisible to the regex
-        clean = _JINJA_RE.sub("__JINJA__", line)
-        match = _FROM_JOIN_SCHEMA_RE.search(clean)
-        if match:
-            seen.add(stripped)
-            ref = f"{match.group(1)}.{match.group(2)}"
+        elif match.lastgroup == "s2":
+            if is_comment or schema_reported:
+                continue
+            schema_reported = True
+            ref = clean[match.start("s1") : match.end("s2")]
             findings.append(
                 Finding(
                     rule="HARDCODED_SCHEMA",
@@ -83,26 +187,42 @@ def check_hardcoded_schema(file_diff: FileDiff) -> List[Finding]:
                         "use {{ ref() }} for dbt models or {{ source() }} for raw tables"
                     ),
                     line=stripped,
-                    line_number=file_diff.added_line_numbers[idx],
+                    line_number=line_number,
+                )
+            )
+        elif match.lastgroup == "bare":
+            if has_ref:
+                continue
+            name = clean[match.start("bare") : match.end("bare")]
+            reported_bare.add(name.lower())
+            findings.append(
+                Finding(
+                    rule="MISSING_REF",
+                    severity="warning",
+                    file=file_diff.filename,
+                    message=(
+                        f'Direct reference to dbt model "{name}" — '
+                        f"use {{{{ ref('{name}') }}}} to track lineage"
+                    ),
+                    line=stripped,
+                    line_number=line_number,
                 )
             )
-    return findings
-
 
-def check_missing_ref(file_diff: FileDiff) -> List[Finding]:
-    """Flag dbt model names used directly in FROM/JOIN without ref()."""
-    findings: List[Finding] = []
-    seen: set[str] = set()
-    for idx, line in enumerate(file_diff.added_lines):
-        stripped = line.strip()
-        if stripped in seen:
-            continue
-        if "ref(" in line:
-            continue
-        clean = _JINJA_RE.sub("", line)
-        for match in _DBT_MODEL_BARE_RE.finditer(clean):
-            name = match.group(1)
-            seen.add(stripped)
+    # The combined pass matches the "__JINJA__"-erased line, but the bare-
+    # model rule erases Jinja with "" — the placeholder can mask a model name
+    # that follows a Jinja expression ("join {{ x }} stg_orders"). Re-check
+    # templated lines against the empty-string erasure.
+    if not has_ref and "{{" in ctx.line:
+        erased = _JINJA_RE.sub("", ctx.line)
+        erased_lower = erased.lower()
+        if len(erased_lower) != len(erased):
+            erased = erased_lower
+        for match in _BARE_JINJA_RE.finditer(erased_lower):
+            name = erased[match.start("bare") : match.end("bare")]
+            if name.lower() in reported_bare:
+                continue
+            reported_bare.add(name.lower())
             findings.append(
                 Finding(
                     rule="MISSING_REF",
@@ -113,9 +233,10 @@ def check_missing_ref(file_diff: FileDiff) -> List[Finding]:
                         f"use {{{{ ref('{name}') }}}} to track lineage"
                     ),
                     line=stripped,
-                    line_number=file_diff.added_line_numbers[idx],
+                    line_number=line_number,
                 )
             )
+
     return findings
 
 
@@ -126,7 +247,37 @@ def check_missing_ref(file_diff: FileDiff) -> List[Finding]:
 def run_all(file_diffs: List[FileDiff]) -> List[Finding]:
     findings: List[Finding] = []
     for fd in file_diffs:
-        findings.extend(check_select_star(fd))
-        findings.extend(check_hardcoded_schema(fd))
-        findings.extend(check_missing_ref(fd))
+        # Deduplicate up front (keyed by stripped text, first occurrence wins)
+        # so each unique line pays the regex cost once; dict preserves order.
+        # A 64-bit bloom over the line hashes answers "definitely new" with a
+        # single integer op, so most lines skip the dict membership test.
+        unique: dict = {}
+        bloom = 0
+        for idx, line in enumerate(fd.added_lines):
+            stripped = line.strip()
+            bit = 1 << (hash(stripped) & 63)
+            if bloom & bit == 0:
+                bloom |= bit
+                unique[stripped] = (line, fd.added_line_numbers[idx])
+            elif stripped not in unique:
+                unique[stripped] = (line, fd.added_line_numbers[idx])
+        unique_lines = list(unique.items())
+        # When Hyperscan is available, a single buffer scan over the unique
+        # lines narrows the loop to candidates before any Python regex work.
+        candidates = (
+            _hs_candidate_lines([line for _, (line, _) in unique_lines])
+            if _HS_DB is not None
+            else None
+        )
+        for pos, (stripped, (line, line_number)) in enumerate(unique_lines):
+            if candidates is not None and pos not in candidates:
+                continue
+            # Cheap byte prescan: every rule needs "*", "from" or "join", so
+            # most lines (comments, blanks, plain SELECT columns) bail here
+            # before paying for the Jinja erasure and the ctx allocation.
+            low = stripped.lower().encode("utf-8", "replace")
+            if _STAR_B not in low and _FROM_B not in low and _JOIN_B not in low:
+                continue
+            ctx = _make_line_ctx(line, stripped, low)
+            findings.extend(_scan_line(fd, ctx, line_number))
     return findings
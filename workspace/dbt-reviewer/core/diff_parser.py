@@ -2,18 +2,27 @@
 
 import re
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Iterable, List, Optional, Union
 
 
-@dataclass
+@dataclass(slots=True)
 class FileDiff:
     filename: str
     added_lines: List[str] = field(default_factory=list)
     # Line numbers in the new file corresponding to each entry in added_lines.
     added_line_numbers: List[int] = field(default_factory=list)
     removed_lines: List[str] = field(default_factory=list)
-    # Reconstructed full content of the new file version (context + added lines)
-    new_content: str = ""
+    # Reconstructed lines of the new file version (context + added lines)
+    new_content_lines: List[str] = field(default_factory=list)
+
+    @property
+    def new_content(self) -> str:
+        """Full new-file text, joined on demand.
+
+        Only the semantic path reads this; deterministic-only runs never pay
+        for the join.
+        """
+        return "\n".join(self.new_content_lines)
 
 
 # Matches the hunk header, e.g. "@@ -1,16 +3,11 @@"
@@ -21,62 +30,81 @@ class FileDiff:
 _HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@")
 
 
-def parse_diff(diff_text: str) -> List[FileDiff]:
-    """Parse a unified diff string and return one FileDiff per changed SQL file.
+def parse_diff(diff: Union[str, Iterable[str]]) -> List[FileDiff]:
+    """Parse a unified diff and return one FileDiff per changed SQL file.
+
+    Accepts either the whole diff as a string or any iterable of lines (an
+    open file, sys.stdin, …) so large diffs can be parsed without holding
+    the full text in memory.
 
     Only added lines (+) and context lines are used to reconstruct new_content.
     Removed lines (-) are stored for reference but not included in new_content.
     """
+    if isinstance(diff, str):
+        lines: Iterable[str] = diff.splitlines()
+    else:
+        lines = (raw.rstrip("\r\n") for raw in diff)
+
     files: List[FileDiff] = []
     current_file: Optional[FileDiff] = None
     new_content_lines: List[str] = []
     new_line_no: int = 0  # current line number in the new file
 
-    for line in diff_text.splitlines():
-        # New file section starts
-        if line.startswith("diff --git "):
+    for line in lines:
+        # Dispatch on the first character; header prefixes ("+++ b/",
+        # "--- ", "diff --git ", "index ") are only tested inside the
+        # matching arm instead of via a startswith chain on every line.
+        ch = line[:1]
+
+        if ch == "+":
+            if line.startswith("+++ b/"):
+                filename = line[6:]
+                if filename != "/dev/null":
+                    current_file = FileDiff(filename=filename)
+            elif current_file is not None:
+                added = line[1:]
+                current_file.added_lines.append(added)
+                current_file.added_line_numbers.append(new_line_no)
+                new_content_lines.append(added)
+                new_line_no += 1
+
+        elif ch == "-":
+            if line.startswith("--- "):
+                pass  # old-side header
+            elif current_file is not None:
+                current_file.removed_lines.append(line[1:])
+                # Removed lines don't exist in the new file — don't increment.
+
+        elif ch == "@":
+            # Parse the hunk header to find where the new-file block starts.
+            m = _HUNK_RE.match(line)
+            if m:
+                new_line_no = int(m.group(1))
+
+        elif ch == "d" and line.startswith("diff --git "):
+            # New file section starts
             if current_file is not None:
-                current_file.new_content = "\n".join(new_content_lines)
+                current_file.new_content_lines = new_content_lines
                 files.append(current_file)
             current_file = None
             new_content_lines = []
             new_line_no = 0
 
-        elif line.startswith("+++ b/"):
-            filename = line[6:]
-            if filename != "/dev/null":
-                current_file = FileDiff(filename=filename)
+        elif ch == "\\":
+            pass  # "\ No newline at end of file"
 
-        elif line.startswith("--- ") or line.startswith("index "):
+        elif ch == "i" and line.startswith("index "):
             pass  # skip diff headers
 
-        elif line.startswith("@@"):
-            # Parse the hunk header to find where the new-file block starts.
-            m = _HUNK_RE.match(line)
-            if m:
-                new_line_no = int(m.group(1))
-
         elif current_file is not None:
-            if line.startswith("+"):
-                added = line[1:]
-                current_file.added_lines.append(added)
-                current_file.added_line_numbers.append(new_line_no)
-                new_content_lines.append(added)
-                new_line_no += 1
-            elif line.startswith("-"):
-                current_file.removed_lines.append(line[1:])
-                # Removed lines don't exist in the new file — don't increment.
-            elif line.startswith("\\"):
-                pass  # "\ No newline at end of file"
-            else:
-                # Context line (starts with space, or is truly empty)
-                context = line[1:] if line.startswith(" ") else line
-                new_content_lines.append(context)
-                new_line_no += 1
+            # Context line (starts with space, or is truly empty)
+            context = line[1:] if ch == " " else line
+            new_content_lines.append(context)
+            new_line_no += 1
 
     # Flush the last file
     if current_file is not None:
-        current_file.new_content = "\n".join(new_content_lines)
+        current_file.new_content_lines = new_content_lines
         files.append(current_file)
 
     # Only return SQL files
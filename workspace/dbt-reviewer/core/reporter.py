@@ -1,6 +1,7 @@
 """Format review findings as a human-readable terminal report."""
 
-from typing import List
+import io
+from typing import Dict, List, Optional, Tuple
 
 from .deterministic import Finding
 from .diff_parser import FileDiff
@@ -18,64 +19,87 @@ def _section(title: str) -> str:
     return f"{'-' * _WIDTH}\n{title}\n{'-' * _WIDTH}"
 
 
-def format_report(file_diffs: List[FileDiff], findings: List[Finding]) -> str:
-    lines: List[str] = []
-
-    lines.append("=" * _WIDTH)
-    lines.append("  dbt Code Review Report")
-    lines.append("=" * _WIDTH)
-    lines.append("")
-    lines.append(f"Files reviewed : {len(file_diffs)}")
-    lines.append(f"Total findings : {len(findings)}")
-    lines.append("")
+def format_report(
+    file_diffs: List[FileDiff], findings: List[Finding]
+) -> Tuple[str, Dict[str, int]]:
+    """Render the report and return it with the per-severity counts, so the
+    caller can derive the exit code without re-scanning the findings."""
+    # Write straight into a string buffer instead of collecting a line list
+    # and joining at the end.
+    buf = io.StringIO()
+    write = buf.write
+
+    def line(text: str = "") -> None:
+        write(text)
+        write("\n")
+
+    line("=" * _WIDTH)
+    line("  dbt Code Review Report")
+    line("=" * _WIDTH)
+    line()
+    line(f"Files reviewed : {len(file_diffs)}")
+    line(f"Total findings : {len(findings)}")
+    line()
 
     if not findings:
-        lines.append("No issues found. Looks good!")
-        lines.append("")
-        lines.append("=" * _WIDTH)
-        return "\n".join(lines)
+        line("No issues found. Looks good!")
+        line()
+        write("=" * _WIDTH)
+        return buf.getvalue(), {severity: 0 for severity in _SEVERITY_ORDER}
+
+    # Bucket findings by severity in one pass; the counts below reuse it.
+    groups: dict = {severity: [] for severity in _SEVERITY_ORDER}
+    for finding in findings:
+        groups.setdefault(finding.severity, []).append(finding)
 
     for severity in _SEVERITY_ORDER:
-        group = [f for f in findings if f.severity == severity]
+        group = groups[severity]
         if not group:
             continue
 
         label = f"{_SEVERITY_LABEL[severity]}S  ({len(group)})"
-        lines.append(_section(label))
+        line(_section(label))
 
         for finding in group:
-            lines.append(f"[{_SEVERITY_LABEL[severity]}] {finding.rule}")
-            lines.append(f"  File    : {finding.file}")
+            line(f"[{_SEVERITY_LABEL[severity]}] {finding.rule}")
+            line(f"  File    : {finding.file}")
             if finding.line:
                 snippet = finding.line[:80] + ("…" if len(finding.line) > 80 else "")
                 line_label = (
                     f"Line {finding.line_number}" if finding.line_number is not None else "Line"
                 )
-                lines.append(f"  {line_label:<9}: {snippet}")
-            lines.append(f"  Message : {finding.message}")
-            lines.append("")
+                line(f"  {line_label:<9}: {snippet}")
+            line(f"  Message : {finding.message}")
+            line()
 
-    lines.append("=" * _WIDTH)
-    lines.append("  Summary")
-    lines.append("=" * _WIDTH)
+    line("=" * _WIDTH)
+    line("  Summary")
+    line("=" * _WIDTH)
 
-    error_count = sum(1 for f in findings if f.severity == "error")
-    warn_count = sum(1 for f in findings if f.severity == "warning")
-    info_count = sum(1 for f in findings if f.severity == "info")
+    error_count = len(groups["error"])
+    warn_count = len(groups["warning"])
+    info_count = len(groups["info"])
 
     if error_count:
-        lines.append(
+        line(
             f"FAILED  — {error_count} error(s)  |  {warn_count} warning(s)  |  {info_count} info(s)"
         )
     else:
-        lines.append(
+        line(
             f"PASSED  — 0 errors  |  {warn_count} warning(s)  |  {info_count} info(s)"
         )
-    lines.append("=" * _WIDTH)
+    write("=" * _WIDTH)
+
+    counts = {severity: len(groups[severity]) for severity in _SEVERITY_ORDER}
+    return buf.getvalue(), counts
 
-    return "\n".join(lines)
 
+def exit_code(findings: List[Finding], counts: Optional[Dict[str, int]] = None) -> int:
+    """Return 1 when any error-severity finding is present, 0 otherwise.
 
-def exit_code(findings: List[Finding]) -> int:
-    """Return 1 when any error-severity finding is present, 0 otherwise."""
+    Pass the counts from format_report to answer in O(1) instead of
+    re-scanning the findings list.
+    """
+    if counts is not None:
+        return 1 if counts.get("error") else 0
     return 1 if any(f.severity == "error" for f in findings) else 0
@@ -3,9 +3,11 @@
 Supports both Anthropic (Claude) and OpenAI (GPT) as providers.
 """
 
+import functools
 import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Optional
 
@@ -14,26 +16,61 @@ from .diff_parser import FileDiff
 
 _PROMPT_PATH = Path(__file__).parent.parent / "prompts" / "review_prompt.txt"
 
-# Matches a JSON array inside optional ```json ... ``` fencing
-_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)\s*```")
+# Several small files share one prompt as long as their combined SQL stays
+# under this budget; anything larger gets its own request.
+_MAX_BATCH_CHARS = 16_000
 
+# A fenced ```json ... ``` block takes precedence; only when no fence is
+# present does the bare object/array pattern run. Folding both into one
+# alternation would let a stray bracket in prose before the fence win the
+# bare branch and swallow the fence markers.
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*([\[{][\s\S]*?[\]}])\s*```")
+_JSON_BARE_RE = re.compile(r"[\[{][\s\S]*[\]}]")
 
+
+@functools.lru_cache(maxsize=1)
 def _load_prompt() -> str:
+    # The template is immutable for the process lifetime — read it once.
     return _PROMPT_PATH.read_text(encoding="utf-8")
 
 
 def _extract_json(text: str) -> str:
-    """Return the first JSON array found in text, stripping markdown fences."""
-    fence = _JSON_FENCE_RE.search(text)
-    if fence:
-        return fence.group(1).strip()
-    start = text.find("[")
-    end = text.rfind("]")
-    if start != -1 and end != -1:
-        return text[start : end + 1]
+    """Return the first JSON object or array found in text, stripping markdown fences."""
+    m = _JSON_FENCE_RE.search(text)
+    if m:
+        return m.group(1).strip()
+    m = _JSON_BARE_RE.search(text)
+    if m:
+        return m.group(0).strip()
     return text.strip()
 
 
+def _batch_file_diffs(file_diffs: List[FileDiff]) -> List[List[FileDiff]]:
+    """Greedily bucket files so each batch's SQL stays under _MAX_BATCH_CHARS."""
+    batches: List[List[FileDiff]] = []
+    current: List[FileDiff] = []
+    size = 0
+    for fd in file_diffs:
+        # Length estimate from the stored lines — avoids joining new_content
+        # just to measure it.
+        length = sum(len(line) + 1 for line in fd.new_content_lines)
+        if current and size + length > _MAX_BATCH_CHARS:
+            batches.append(current)
+            current = []
+            size = 0
+        current.append(fd)
+        size += length
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _render_files_block(batch: List[FileDiff]) -> str:
+    return "\n\n".join(
+        f"## FILE: {fd.filename}\n```sql\n{fd.new_content}\n```" for fd in batch
+    )
+
+
 def _call_anthropic(client, model: str, prompt: str) -> str:
     response = client.messages.create(
         model=model,
@@ -103,39 +140,60 @@ def run_semantic_checks(
         api_error = anthropic.APIError
 
     prompt_template = _load_prompt()
-    findings: List[Finding] = []
-
-    for fd in file_diffs:
-        if not fd.new_content.strip():
-            continue
 
-        prompt = prompt_template.replace("{filename}", fd.filename).replace(
-            "{sql_content}", fd.new_content
-        )
+    def _review_batch(batch: List[FileDiff]) -> List[Finding]:
+        prompt = prompt_template.replace("{files}", _render_files_block(batch))
+        labels = ", ".join(fd.filename for fd in batch)
+        batch_findings: List[Finding] = []
 
         try:
             raw = call_fn(client, effective_model, prompt)
             json_text = _extract_json(raw)
-            raw_findings = json.loads(json_text)
-
-            for rf in raw_findings:
-                rule = rf.get("rule", "UNKNOWN")
-                severity = rf.get("severity", "info")
-                message = rf.get("message", "")
-                if not message:
-                    continue
-                findings.append(
-                    Finding(
-                        rule=rule,
-                        severity=severity,
-                        file=fd.filename,
-                        message=message,
+            parsed = json.loads(json_text)
+
+            # Tolerate a bare array for single-file batches.
+            if isinstance(parsed, list) and len(batch) == 1:
+                parsed = {batch[0].filename: parsed}
+            if not isinstance(parsed, dict):
+                print(f"Warning: Unexpected AI response shape for {labels}")
+                return []
+
+            for fd in batch:
+                for rf in parsed.get(fd.filename, []):
+                    rule = rf.get("rule", "UNKNOWN")
+                    severity = rf.get("severity", "info")
+                    message = rf.get("message", "")
+                    if not message:
+                        continue
+                    batch_findings.append(
+                        Finding(
+                            rule=rule,
+                            severity=severity,
+                            file=fd.filename,
+                            message=message,
+                        )
                     )
-                )
 
         except json.JSONDecodeError as exc:
-            print(f"Warning: Could not parse AI response for {fd.filename}: {exc}")
+            print(f"Warning: Could not parse AI response for {labels}: {exc}")
         except api_error as exc:
-            print(f"Warning: {provider.capitalize()} API error for {fd.filename}: {exc}")
+            print(f"Warning: {provider.capitalize()} API error for {labels}: {exc}")
+
+        return batch_findings
+
+    to_review = [
+        fd for fd in file_diffs if any(line.strip() for line in fd.new_content_lines)
+    ]
+    if not to_review:
+        return []
+
+    # Small files share one prompt; batches are latency-bound API calls, so
+    # run them concurrently.
+    batches = _batch_file_diffs(to_review)
+    findings: List[Finding] = []
+    with ThreadPoolExecutor(max_workers=min(8, len(batches))) as pool:
+        futures = [pool.submit(_review_batch, batch) for batch in batches]
+        for future in as_completed(futures):
+            findings.extend(future.result())
 
     return findings
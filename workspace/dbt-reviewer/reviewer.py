@@ -75,29 +75,22 @@ def main() -> None:
     args = parser.parse_args()
 
     # ------------------------------------------------------------------ #
-    # 1. Read the diff
+    # 1. Read and parse the diff (streamed line-by-line)
     # ------------------------------------------------------------------ #
     if args.diff:
         diff_path = Path(args.diff)
         if not diff_path.exists():
             print(f"Error: diff file not found: {args.diff}", file=sys.stderr)
             sys.exit(2)
-        diff_text = diff_path.read_text(encoding="utf-8")
+        with diff_path.open("r", encoding="utf-8") as diff_file:
+            file_diffs = parse_diff(diff_file)
     else:
         if sys.stdin.isatty():
             parser.print_help()
             print("\nError: no diff provided — use --diff FILE or pipe from git diff.", file=sys.stderr)
             sys.exit(2)
-        diff_text = sys.stdin.read()
+        file_diffs = parse_diff(sys.stdin)
 
-    if not diff_text.strip():
-        print("Empty diff — nothing to review.")
-        sys.exit(0)
-
-    # ------------------------------------------------------------------ #
-    # 2. Parse
-    # ------------------------------------------------------------------ #
-    file_diffs = parse_diff(diff_text)
     if not file_diffs:
         print("No SQL files found in diff.")
         sys.exit(0)
@@ -105,12 +98,12 @@ def main() -> None:
     print(f"Reviewing {len(file_diffs)} changed SQL file(s)…\n")
 
     # ------------------------------------------------------------------ #
-    # 3. Deterministic checks
+    # 2. Deterministic checks
     # ------------------------------------------------------------------ #
     all_findings = run_deterministic(file_diffs)
 
     # ------------------------------------------------------------------ #
-    # 4. Semantic checks (optional)
+    # 3. Semantic checks (optional)
     # ------------------------------------------------------------------ #
     if not args.no_semantic:
         semantic = run_semantic_checks(
@@ -122,10 +115,11 @@ def main() -> None:
         all_findings.extend(semantic)
 
     # ------------------------------------------------------------------ #
-    # 5. Report
+    # 4. Report
     # ------------------------------------------------------------------ #
-    print(format_report(file_diffs, all_findings))
-    sys.exit(exit_code(all_findings))
+    report, counts = format_report(file_diffs, all_findings)
+    print(report)
+    sys.exit(exit_code(all_findings, counts))
 
 
 if __name__ == "__main__":